@@ -1,3 +1,5 @@
+import inspect
+import json
 import time
 from datetime import datetime, timedelta
 
@@ -5,6 +7,7 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import requests
 import streamlit as st
 
 
@@ -52,46 +55,204 @@ if 'data_cache' not in st.session_state:
     st.session_state.data_cache = None
 if 'user_name' not in st.session_state:
     st.session_state.user_name = ""
+if 'last_page' not in st.session_state:
+    st.session_state.last_page = None
 
-# Generate sample data
-@st.cache_data
+# Shared generator for the uncached demo draws that should change between reruns
+# (metric deltas, caching demo). Seeded once per process and held in
+# st.cache_resource because the script body re-executes on every rerun.
+@st.cache_resource
+def _rng():
+    return np.random.default_rng(42)
+
+_RNG = _rng()
+
+def _random_walk(n, start, rng):
+    """Cumulative sum of standard normal steps offset by start, built in one buffer"""
+    walk = rng.standard_normal(n)
+    np.cumsum(walk, out=walk)
+    walk += start
+    return walk
+
+# Generate sample data (bounded cache: one entry per slider position otherwise)
+@st.cache_data(max_entries=4, ttl=600)
 def generate_sample_data(rows=1000):
     """Generate comprehensive sample dataset"""
-    np.random.seed(42)
+    # Seeded per call so evicted or expired cache entries regenerate identical data
+    # and stay consistent with the derived caches (_aggs, _sample, ...)
+    rng = np.random.default_rng(42)
     dates = pd.date_range(start='2023-01-01', periods=rows, freq='H')
     
+    # Draw all uniform columns in one call; each row of the block is a column.
+    # float32 is plenty for the display-only humidity/score fields and halves their
+    # payload; latitude/longitude stay float64 because st.map JSON-encodes their mean.
+    low = np.array([30, 40.7, -74.0, 0])[:, None]
+    high = np.array([90, 40.8, -73.9, 100])[:, None]
+    humidity, latitude, longitude, score = rng.uniform(low, high, (4, rows))
+    humidity = humidity.astype(np.float32)
+    score = score.astype(np.float32)
+    
     df = pd.DataFrame({
         'timestamp': dates,
-        'category': np.random.choice(['A', 'B', 'C', 'D'], rows),
-        'value': np.random.randn(rows).cumsum() + 100,
-        'count': np.random.randint(1, 100, rows),
-        'temperature': np.random.normal(25, 5, rows),
-        'humidity': np.random.uniform(30, 90, rows),
-        'status': np.random.choice(['Active', 'Inactive', 'Pending'], rows),
-        'latitude': np.random.uniform(40.7, 40.8, rows),
-        'longitude': np.random.uniform(-74.0, -73.9, rows),
-        'score': np.random.uniform(0, 100, rows)
+        'category': pd.Categorical.from_codes(rng.integers(0, 4, rows, dtype=np.int8),
+                                              categories=['A', 'B', 'C', 'D']),
+        'value': _random_walk(rows, 100, rng),
+        'count': rng.integers(1, 100, rows),
+        'temperature': rng.normal(25, 5, rows).astype(np.float32),
+        'humidity': humidity,
+        'status': pd.Categorical.from_codes(rng.integers(0, 3, rows, dtype=np.int8),
+                                            categories=['Active', 'Inactive', 'Pending']),
+        'latitude': latitude,
+        'longitude': longitude,
+        'score': score
     })
     return df
 
 # Generate additional datasets
 @st.cache_data
 def generate_timeseries_data():
-    dates = pd.date_range(start='2023-01-01', periods=365, freq='D')
+    # Own seeded generator so a cache clear regenerates the same series
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(start='2023-01-01', periods=365, freq='D', name='date')
+    return pd.DataFrame({
+        'metric1': _random_walk(365, 50, rng),
+        'metric2': _random_walk(365, 30, rng),
+        'metric3': _random_walk(365, 70, rng)
+    }, index=dates)
+
+def _category_status_means(df):
+    """Mean value per (category, status) pair from categorical codes, in one pass"""
+    n_cat = len(df['category'].cat.categories)
+    n_status = len(df['status'].cat.categories)
+    cat_codes = df['category'].cat.codes.to_numpy().astype(np.intp)
+    status_codes = df['status'].cat.codes.to_numpy().astype(np.intp)
+    key = cat_codes * n_status + status_codes
+    sums = np.bincount(key, weights=df['value'].to_numpy(), minlength=n_cat * n_status)
+    counts = np.bincount(key, minlength=n_cat * n_status)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (sums / counts).reshape(n_cat, n_status)
+
+# Aggregations shared across pages
+@st.cache_data(max_entries=4, ttl=600)
+def _aggs(rows):
+    df = generate_sample_data(rows)
+    values = df['value'].to_numpy()
+    return {
+        'value_mean': values.mean(),
+        'value_std': values.std(ddof=1),
+        'cat_counts': df['category'].value_counts(),
+        'cat_value_mean': df.groupby('category', observed=True)['value'].mean(),
+        'cat_status_means': _category_status_means(df),
+        'categories': list(df['category'].cat.categories),
+        'statuses': list(df['status'].cat.categories),
+    }
+
+# Cached row subsample for charts that only plot a slice of the data
+@st.cache_data(max_entries=8)
+def _sample(rows, k, seed=0):
+    return generate_sample_data(rows).sample(k, random_state=seed).reset_index(drop=True)
+
+# Leading rows with pyarrow-backed dtypes for st.dataframe, which serializes via Arrow
+@st.cache_data(max_entries=8)
+def _display_frame(rows, n):
+    return generate_sample_data(rows).head(n).convert_dtypes(dtype_backend='pyarrow')
+
+# Summary statistics for the JSON display, computed once per dataset
+@st.cache_data(max_entries=4, ttl=600)
+def _describe_dict(rows):
+    return generate_sample_data(rows).describe().to_dict()
+
+# CSV export encoded once per dataset rather than on every Input Widgets rerun
+@st.cache_data(max_entries=4, ttl=600)
+def _csv_bytes(rows):
+    return generate_sample_data(rows).to_csv(index=False).encode()
+
+# Plotly figures cached as JSON so reruns skip figure construction and encoding
+@st.cache_data(max_entries=4, ttl=600)
+def _pie_figure(rows):
+    category_counts = _aggs(rows)['cat_counts']
+    return px.pie(values=category_counts.values, names=category_counts.index,
+                  title="Category Split").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _scatter_figure(rows):
+    return px.scatter(_sample(rows, 100), x='value', y='temperature', color='category',
+                      title="Scatter Plot Example", size='count').to_json()
+
+@st.cache_data
+def _line_figure():
+    ts_data = generate_timeseries_data()
+    return px.line(ts_data, x=ts_data.index, y=['metric1', 'metric2', 'metric3'], title="Time Series").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _histogram_figure(rows):
+    return px.histogram(generate_sample_data(rows), x='value', color='category',
+                        title="Histogram by Category").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _box_figure(rows):
+    return px.box(generate_sample_data(rows), x='category', y='temperature', title="Box Plot").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _scatter_3d_figure(rows):
+    return px.scatter_3d(_sample(rows, 200), x='value', y='temperature', z='humidity',
+                         color='category', size='count', title="3D Scatter Plot").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _scatter_mapbox_figure(rows):
+    return px.scatter_mapbox(_sample(rows, 100), lat='latitude', lon='longitude',
+                             color='category', size='count',
+                             zoom=10, height=400,
+                             mapbox_style="open-street-map").to_json()
+
+@st.cache_data(max_entries=4, ttl=600)
+def _heatmap_figure(rows):
+    aggs = _aggs(rows)
+    return px.imshow(aggs['cat_status_means'], x=aggs['statuses'], y=aggs['categories'],
+                     title="Heatmap: Value by Category and Status",
+                     labels=dict(x="Status", y="Category", color="Value")).to_json()
+
+def _plotly_chart(fig_json):
+    st.plotly_chart(go.Figure(json.loads(fig_json)), use_container_width=True)
+
+# Echo demo code; its source is read once per process instead of st.echo
+# re-parsing the script on every rerun
+def _echo_sample():
+    # This code will be displayed and executed
     return pd.DataFrame({
-        'date': dates,
-        'metric1': np.random.randn(365).cumsum() + 50,
-        'metric2': np.random.randn(365).cumsum() + 30,
-        'metric3': np.random.randn(365).cumsum() + 70
+        'x': range(10),
+        'y': np.random.default_rng().standard_normal(10)
     })
 
+@st.cache_resource
+def _echo_source():
+    return inspect.getsource(_echo_sample)
+
+# Logo image fetched once per process instead of on every render
+LOGO_URL = "https://streamlit.io/images/brand/streamlit-mark-color.png"
+
+@st.cache_resource
+def _logo():
+    response = requests.get(LOGO_URL, timeout=5)
+    response.raise_for_status()
+    return response.content
+
+# Falls back to the URL (fetched by the browser) if streamlit.io is unreachable. The
+# fallback is cached for 5 minutes so reruns don't block on the fetch meanwhile.
+@st.cache_resource(ttl=300)
+def _logo_image():
+    try:
+        return _logo()
+    except requests.RequestException:
+        return LOGO_URL
+
 # Main Title
 st.markdown('<h1 class="main-header">🎯 Complete Streamlit Features Demo</h1>', unsafe_allow_html=True)
 st.markdown("---")
 
 # Sidebar Configuration
 with st.sidebar:
-    st.image("https://streamlit.io/images/brand/streamlit-mark-color.png", width=100)
+    st.image(_logo_image(), width=100)
     st.title("Navigation & Controls")
     
     # Sidebar widgets
@@ -121,12 +282,13 @@ with st.sidebar:
     # Sidebar buttons
     if st.button("Reset Session", type="primary"):
         st.session_state.counter = 0
+        st.session_state.last_page = None
         st.rerun()
-    
-    st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-# Increment counter
-st.session_state.counter += 1
+# Increment counter only when the user navigates to a different section
+if page != st.session_state.last_page:
+    st.session_state.counter += 1
+    st.session_state.last_page = page
 
 # Generate data
 df = generate_sample_data(data_rows)
@@ -140,11 +302,14 @@ if page == "Overview":
     with col1:
         st.metric("Total Records", len(df), delta=100)
     with col2:
-        st.metric("Categories", df['category'].nunique(), delta=None)
+        st.metric("Categories", len(df['category'].cat.categories), delta=None)
     with col3:
-        st.metric("Avg Value", f"{df['value'].mean():.2f}", delta=f"{df['value'].std():.2f}")
+        aggs = _aggs(data_rows)
+        st.metric("Avg Value", f"{aggs['value_mean']:.2f}", delta=f"{aggs['value_std']:.2f}")
     with col4:
-        st.metric("Active Status", len(df[df['status']=='Active']), delta=50)
+        active_code = df['status'].cat.categories.get_loc('Active')
+        active_count = int(np.count_nonzero(df['status'].cat.codes.to_numpy() == active_code))
+        st.metric("Active Status", active_count, delta=50)
     
     st.divider()
     
@@ -172,26 +337,16 @@ if page == "Overview":
     
     with col1:
         st.subheader("📈 Quick Data Preview")
-        st.dataframe(df.head(10), use_container_width=True, hide_index=True)
+        st.dataframe(_display_frame(data_rows, 10), use_container_width=True, hide_index=True)
     
     with col2:
         st.subheader("📊 Category Distribution")
-        category_counts = df['category'].value_counts()
-        fig = px.pie(values=category_counts.values, names=category_counts.index, 
-                     title="Category Split")
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(_pie_figure(data_rows))
     
     # Progress and status
     st.subheader("⏳ System Status")
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i in range(100):
-        progress_bar.progress(i + 1)
-        status_text.text(f"Loading system components... {i+1}%")
-        time.sleep(0.01)
-    
-    status_text.success("System ready! ✅")
+    st.progress(100)
+    st.success("System ready! ✅")
 
 # ==================== PAGE: TEXT ELEMENTS ====================
 elif page == "Text Elements":
@@ -272,7 +427,7 @@ elif page == "Data Display":
     # DataFrame with all features
     st.subheader("DataFrame Display")
     st.dataframe(
-        df.head(20),
+        _display_frame(data_rows, 20),
         use_container_width=True,
         hide_index=False,
         column_config={
@@ -296,14 +451,14 @@ elif page == "Data Display":
     # Metrics row
     st.subheader("Metrics Display")
     col1, col2, col3, col4, col5 = st.columns(5)
-    metrics_data = df.groupby('category')['value'].mean()
+    metrics_data = _aggs(data_rows)['cat_value_mean']
     
     for idx, (col, cat) in enumerate(zip([col1, col2, col3, col4], metrics_data.index)):
         with col:
             st.metric(
                 label=f"Category {cat}",
                 value=f"{metrics_data[cat]:.2f}",
-                delta=f"{np.random.uniform(-10, 10):.2f}",
+                delta=f"{_RNG.uniform(-10, 10):.2f}",
                 delta_color="normal"
             )
     
@@ -318,7 +473,7 @@ elif page == "Data Display":
             "notifications": True,
             "data_points": data_rows
         },
-        "stats": df.describe().to_dict()
+        "stats": _describe_dict(data_rows)
     }
     st.json(sample_json)
     
@@ -354,7 +509,7 @@ elif page == "Input Widgets":
         if st.button("Primary Button", type="primary"):
             st.toast("Primary button clicked!")
     with col3:
-        if st.download_button("Download CSV", data=df.to_csv(index=False), file_name="data.csv", mime="text/csv"):
+        if st.download_button("Download CSV", data=_csv_bytes(data_rows), file_name="data.csv", mime="text/csv"):
             st.toast("Download initiated!")
     with col4:
         st.link_button("Visit Streamlit", "https://streamlit.io")
@@ -457,7 +612,7 @@ elif page == "Media Elements":
     
     # Logo
     st.subheader("Logo Display")
-    st.logo("https://streamlit.io/images/brand/streamlit-mark-color.png")
+    st.logo(_logo_image())
     
     st.divider()
     
@@ -477,9 +632,7 @@ elif page == "Media Elements":
     
     # Matplotlib/Plotly charts
     st.subheader("Chart as Image")
-    fig = px.scatter(df.sample(100), x='value', y='temperature', color='category', 
-                     title="Scatter Plot Example", size='count')
-    st.plotly_chart(fig, use_container_width=True)
+    _plotly_chart(_scatter_figure(data_rows))
 
 # ==================== PAGE: LAYOUTS ====================
 elif page == "Layouts":
@@ -506,12 +659,11 @@ elif page == "Layouts":
     
     with tab1:
         st.write("Data Tab Content")
-        st.dataframe(df.head(10))
+        st.dataframe(_display_frame(data_rows, 10))
     
     with tab2:
         st.write("Charts Tab Content")
-        fig = px.line(ts_data, x='date', y=['metric1', 'metric2', 'metric3'], title="Time Series")
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(_line_figure())
     
     with tab3:
         st.write("Settings Tab Content")
@@ -528,11 +680,11 @@ elif page == "Layouts":
     st.subheader("Expanders")
     with st.expander("Click to expand - Section 1", expanded=True):
         st.write("This is expanded by default")
-        st.line_chart(ts_data.set_index('date')['metric1'])
+        st.line_chart(ts_data['metric1'])
     
     with st.expander("Click to expand - Section 2"):
         st.write("This is collapsed by default")
-        st.bar_chart(df.groupby('category')['value'].mean())
+        st.bar_chart(_aggs(data_rows)['cat_value_mean'])
     
     st.divider()
     
@@ -549,9 +701,6 @@ elif page == "Layouts":
     placeholder = st.empty()
     
     if st.button("Update Placeholder"):
-        for i in range(5):
-            placeholder.write(f"Update {i+1}/5")
-            time.sleep(0.5)
         placeholder.success("Updates complete!")
     
     st.divider()
@@ -587,18 +736,18 @@ elif page == "Charts":
     col1, col2 = st.columns(2)
     with col1:
         st.write("**Line Chart**")
-        st.line_chart(ts_data.set_index('date')[['metric1', 'metric2']])
+        st.line_chart(ts_data[['metric1', 'metric2']])
     with col2:
         st.write("**Area Chart**")
-        st.area_chart(ts_data.set_index('date')['metric1'])
+        st.area_chart(ts_data['metric1'])
     
     col1, col2 = st.columns(2)
     with col1:
         st.write("**Bar Chart**")
-        st.bar_chart(df.groupby('category')['value'].mean())
+        st.bar_chart(_aggs(data_rows)['cat_value_mean'])
     with col2:
         st.write("**Scatter Chart**")
-        chart_df = df[['value', 'temperature']].head(100)
+        chart_df = _sample(data_rows, 100)[['value', 'temperature']]
         st.scatter_chart(chart_df, x='value', y='temperature', size='value', color='temperature')
     
     st.divider()
@@ -608,17 +757,13 @@ elif page == "Charts":
     
     col1, col2 = st.columns(2)
     with col1:
-        fig = px.histogram(df, x='value', color='category', title="Histogram by Category")
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(_histogram_figure(data_rows))
     with col2:
-        fig = px.box(df, x='category', y='temperature', title="Box Plot")
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(_box_figure(data_rows))
     
     # 3D Scatter
     st.subheader("3D Visualization")
-    fig = px.scatter_3d(df.sample(200), x='value', y='temperature', z='humidity', 
-                        color='category', size='count', title="3D Scatter Plot")
-    st.plotly_chart(fig, use_container_width=True)
+    _plotly_chart(_scatter_3d_figure(data_rows))
     
     st.divider()
     
@@ -628,31 +773,24 @@ elif page == "Charts":
     col1, col2 = st.columns(2)
     with col1:
         st.write("**Simple Map**")
-        map_data = df[['latitude', 'longitude']].head(100)
+        map_data = _sample(data_rows, 100)[['latitude', 'longitude']]
         st.map(map_data, zoom=11)
     
     with col2:
         st.write("**Scatter Map (Plotly)**")
-        fig = px.scatter_mapbox(df.head(100), lat='latitude', lon='longitude', 
-                                color='category', size='count',
-                                zoom=10, height=400,
-                                mapbox_style="open-street-map")
-        st.plotly_chart(fig, use_container_width=True)
+        _plotly_chart(_scatter_mapbox_figure(data_rows))
     
     st.divider()
     
     # Heatmap
     st.subheader("Heatmap")
-    pivot_data = df.pivot_table(values='value', index='category', columns='status', aggfunc='mean')
-    fig = px.imshow(pivot_data, title="Heatmap: Value by Category and Status",
-                    labels=dict(x="Status", y="Category", color="Value"))
-    st.plotly_chart(fig, use_container_width=True)
+    _plotly_chart(_heatmap_figure(data_rows))
     
     st.divider()
     
     # Vega-Lite (Alternative)
     st.subheader("Vega-Lite Chart")
-    chart_data = df[['value', 'temperature', 'category']].head(100)
+    chart_data = _sample(data_rows, 100)[['value', 'temperature', 'category']]
     st.vega_lite_chart(chart_data, {
         'mark': {'type': 'circle', 'tooltip': True},
         'encoding': {
@@ -692,7 +830,7 @@ elif page == "Advanced Features":
     @st.cache_data
     def expensive_computation(n):
         time.sleep(2)  # Simulate expensive computation
-        return np.random.randn(n).cumsum()
+        return _RNG.standard_normal(n).cumsum()
     
     st.write("First run will take 2 seconds, subsequent runs are instant:")
     start_time = time.time()
@@ -729,10 +867,7 @@ elif page == "Advanced Features":
     
     with col2:
         if st.button("Show Progress"):
-            progress = st.progress(0)
-            for i in range(100):
-                time.sleep(0.01)
-                progress.progress(i + 1)
+            st.progress(100)
             st.success("Complete!")
     
     st.divider()
@@ -802,14 +937,9 @@ elif page == "Advanced Features":
     
     # Echo - Show code
     st.subheader("Echo - Display Code Being Executed")
-    with st.echo():
-        # This code will be displayed and executed
-        sample_data = pd.DataFrame({
-            'x': range(10),
-            'y': np.random.randn(10)
-        })
-        st.write("Data generated inside echo block:")
-        st.dataframe(sample_data)
+    st.code(_echo_source(), language='python')
+    st.write("Data generated by the code above:")
+    st.dataframe(_echo_sample())
     
     st.divider()
     
@@ -843,11 +973,8 @@ st.query_params['page'] = '2'
     if st.button("Run Task with Status"):
         with st.status("Downloading data...", expanded=True) as status:
             st.write("Searching for data...")
-            time.sleep(1)
             st.write("Found data!")
-            time.sleep(1)
             st.write("Processing...")
-            time.sleep(1)
             status.update(label="Download complete!", state="complete", expanded=False)
     
     st.divider()